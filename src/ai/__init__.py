@@ -1,6 +1,8 @@
 """AI module for deep research platform."""
 
 from .response import WebSearchResponse, ClaudeResponse
+from .cache import CacheBackend, LLMCache, MemoryCacheBackend, SemanticCache, SQLiteCacheBackend
+from .ratelimit import RateLimiter
 from .claude import ClaudeWebSearch
 from .openai_ws import OpenAIWebSearch
 
@@ -8,5 +10,11 @@ __all__ = [
     'ClaudeWebSearch',
     'OpenAIWebSearch',
     'WebSearchResponse',
+    'LLMCache',
+    'CacheBackend',
+    'MemoryCacheBackend',
+    'SQLiteCacheBackend',
+    'SemanticCache',
+    'RateLimiter',
     'ClaudeResponse',  # Backward compatibility
 ]
@@ -0,0 +1,211 @@
+"""
+Response caching for web search helpers.
+
+Identical requests (same model, prompt, system prompt and tools) are served
+from a cache instead of calling the API again. SemanticCache adds a second
+tier that also matches paraphrased prompts by embedding similarity.
+"""
+
+import hashlib
+import json
+import math
+import pickle
+import sqlite3
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Protocol
+
+from src.ai.response import WebSearchResponse
+
+
+class CacheBackend(Protocol):
+    """Storage used by LLMCache (in-memory by default, SQLite or others pluggable)."""
+
+    def get(self, key: str) -> Optional[WebSearchResponse]:
+        """Return the cached response for key, or None on a miss."""
+        ...
+
+    def set(self, key: str, value: WebSearchResponse) -> None:
+        """Store a response under key."""
+        ...
+
+
+class MemoryCacheBackend:
+    """In-process cache with LRU eviction and a per-entry time to live."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        """
+        Initialize the in-memory cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before evicting the least recently used
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, WebSearchResponse]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[WebSearchResponse]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: WebSearchResponse) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class SQLiteCacheBackend:
+    """
+    Persistent cache stored in a local SQLite file, shared across runs.
+
+    Responses are pickled, so only point this at a file you trust.
+    """
+
+    def __init__(self, path: str, ttl: float = 7 * 24 * 3600):
+        """
+        Initialize the on-disk cache, creating the file if needed.
+
+        Args:
+            path: SQLite database file
+            ttl: Seconds an entry stays valid
+        """
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        # WAL with normal sync makes each per-response commit an append to the
+        # log rather than a full journal write and fsync
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses "
+            "(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)"
+        )
+        # Expired entries are purged once per open; get() already skips them
+        self._db.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[WebSearchResponse]:
+        row = self._db.execute(
+            "SELECT value FROM responses WHERE key = ? AND expires_at >= ?",
+            (key, time.time())
+        ).fetchone()
+        if row is None:
+            return None
+
+        try:
+            return pickle.loads(row[0])
+        except Exception:
+            # Entry written by an incompatible version; treat it as a miss
+            return None
+
+    def set(self, key: str, value: WebSearchResponse) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO responses (key, expires_at, value) VALUES (?, ?, ?)",
+            (key, time.time() + self.ttl, pickle.dumps(value))
+        )
+        self._db.commit()
+
+
+class LLMCache:
+    """Exact-match response cache keyed by a hash of the full request."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            backend: Storage backend (default: MemoryCacheBackend)
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+
+    @staticmethod
+    def make_key(request: dict) -> str:
+        """Hash the request arguments (model, messages, system, tools, ...) into a cache key."""
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[WebSearchResponse]:
+        return self.backend.get(key)
+
+    def set(self, key: str, value: WebSearchResponse) -> None:
+        self.backend.set(key, value)
+
+
+class SemanticCache:
+    """Nearest-neighbour cache matching paraphrased prompts by cosine similarity."""
+
+    def __init__(
+        self,
+        threshold: float = 0.92,
+        ttl: float = 3600,
+        maxsize: int = 1024,
+        embedding_model: str = "text-embedding-3-small",
+        client=None
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a prompt to count as a hit
+            ttl: Seconds an entry stays valid (web search answers go stale)
+            maxsize: Maximum number of entries kept before evicting the oldest
+            embedding_model: OpenAI embedding model name
+            client: OpenAI client used for embeddings (default: shared OpenAI client)
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.embedding_model = embedding_model
+        self.client = client
+        self._entries: list[tuple[float, str, list[float], WebSearchResponse]] = []
+
+        # get() and set() for the same prompt share one embedding request
+        self.embed = lru_cache(maxsize=maxsize)(self._embed)
+
+    def _embed(self, prompt: str) -> list[float]:
+        """Return the unit-normalized embedding for a prompt."""
+        if self.client is None:
+            from src.ai.openai_ws import get_client
+            self.client = get_client()
+
+        vector = self.client.embeddings.create(model=self.embedding_model, input=prompt).data[0].embedding
+        norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+        return [x / norm for x in vector]
+
+    def get(self, prompt: str, namespace: str) -> Optional[WebSearchResponse]:
+        """
+        Return the cached response for the most similar prompt, or None.
+
+        Args:
+            prompt: The user prompt/question
+            namespace: Key for everything except the prompt (model, system prompt, tools)
+        """
+        now = time.monotonic()
+        self._entries = [entry for entry in self._entries if entry[0] >= now]
+
+        query = self.embed(prompt)
+        best_score, best_value = self.threshold, None
+        for _, entry_namespace, vector, value in self._entries:
+            if entry_namespace != namespace:
+                continue
+            score = sum(a * b for a, b in zip(query, vector))
+            if score >= best_score:
+                best_score, best_value = score, value
+        return best_value
+
+    def set(self, prompt: str, namespace: str, value: WebSearchResponse) -> None:
+        """Store a response under the prompt's embedding."""
+        self._entries.append((time.monotonic() + self.ttl, namespace, self.embed(prompt), value))
+        if len(self._entries) > self.maxsize:
+            del self._entries[:len(self._entries) - self.maxsize]
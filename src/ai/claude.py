@@ -5,12 +5,69 @@ This module provides a helper class to interact with Claude using Anthropic's SD
 with built-in web search capabilities and citation extraction.
 """
 
-import json
-from typing import Optional
+import asyncio
+import logging
+import time
+from functools import cache
+from typing import Iterator, Optional
+
+import httpx
+from anthropic import Anthropic, APIError, AsyncAnthropic, DefaultAsyncHttpxClient, DefaultHttpxClient
+from pydantic import BaseModel, ValidationError
+
+from src.ai.cache import LLMCache, SemanticCache
+from src.ai.ratelimit import RateLimiter, estimate_tokens
+from src.ai.response import WebSearchResponse
 
-from anthropic import Anthropic
 
-from src.ai.response import WebSearchResponse
+# Connection pool shared by every ClaudeWebSearch instance so repeated
+# helpers reuse warm keep-alive connections instead of new TLS handshakes
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=50,
+    keepalive_expiry=30.0
+)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+logger = logging.getLogger(__name__)
+
+# Description of the tool used to return structured output
+OUTPUT_TOOL_DESCRIPTION = (
+    "Record the final answer. Call this exactly once, after all web searches "
+    "are done, using only facts found in the search results."
+)
+
+
+@cache
+def get_client() -> Anthropic:
+    """Return the process-wide Anthropic client, created on first use."""
+    return Anthropic(
+        http_client=DefaultHttpxClient(limits=HTTP_LIMITS),
+        timeout=HTTP_TIMEOUT
+    )
+
+
+@cache
+def get_async_client() -> AsyncAnthropic:
+    """Return the process-wide AsyncAnthropic client, created on first use."""
+    return AsyncAnthropic(
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS),
+        timeout=HTTP_TIMEOUT
+    )
+
+
+def prewarm() -> None:
+    """
+    Open a connection to the Anthropic API ahead of the first search.
+
+    Call once at service startup so the TLS handshake is already done and a
+    keep-alive connection is waiting in the shared pool. Failures are ignored;
+    the first real request simply pays the connection cost instead.
+    """
+    try:
+        get_client().models.list()
+    except APIError:
+        pass
 
 
 class ClaudeWebSearch:
@@ -20,103 +77,227 @@ class ClaudeWebSearch:
         self,
         model: str = "claude-sonnet-4-5",
         max_uses: int = 3,
-        max_tokens: int = 4096
+        max_tokens: int = 4096,
+        temperature: Optional[float] = None,
+        cache: Optional[LLMCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        rate_limiter: Optional[RateLimiter] = None
     ):
         """
         Initialize Claude with web search support.
 
         Args:
             model: Claude model name (default: claude-sonnet-4-5)
-            temperature: Sampling temperature (0-1)
+            max_uses: Maximum number of web searches per request
             max_tokens: Maximum tokens in response
+            temperature: Sampling temperature (0-1, default: API default)
+            cache: Optional response cache; identical requests skip the API call
+                (only used with temperature=0; other temperatures sample, and
+                the API default is 1.0)
+            semantic_cache: Optional cache that also matches paraphrased prompts
+            rate_limiter: Optional client-side pacing for async calls,
+                e.g. RateLimiter.for_provider("anthropic")
         """
         self.model = model
         self.max_uses = max_uses
         self.max_tokens = max_tokens
-
-        self.client = Anthropic()
-
-    def search(self, prompt: str, system_prompt: Optional[str] = None) -> WebSearchResponse:
-        """
-        Execute a search query with Claude using web search tool.
-
-        Args:
-            prompt: The user prompt/question
-            system_prompt: Optional system prompt to guide Claude's behavior
-
-        Returns:
-            WebSearchResponse with final_output, citations, and raw response
-        """
-        # Prepare messages
-        messages = [
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
+        self.temperature = temperature
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.rate_limiter = rate_limiter
 
         # Define web search tool
         # Note: Using the latest web_search tool version
         # The name field is required for web_search tools
-        tools = [
+        self._tools = [
             {
                 "type": "web_search_20250305",
                 "name": "web_search",
-                "max_uses": self.max_uses
+                "max_uses": max_uses
             }
         ]
 
-        # Make API call with web search enabled
+        # Request arguments shared by every call, with web search enabled
+        self._base_kwargs = {
+            "model": model,
+            "max_tokens": max_tokens,
+            "tools": self._tools,
+        }
+        if temperature is not None:
+            self._base_kwargs["temperature"] = temperature
+
+        self.client = get_client()
+        self.async_client = get_async_client()
+
+    def _build_kwargs(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> dict:
+        """Build the messages.create arguments for a single prompt."""
         kwargs = {
-            "model": self.model,
-            "max_tokens": self.max_tokens,
-            "messages": messages,
-            "tools": tools,
+            **self._base_kwargs,
+            "messages": [{"role": "user", "content": prompt}],
         }
 
+        # Bind the output schema as a client tool so the structured answer comes
+        # back in the same call; the choice stays "auto" because forcing this
+        # tool would stop Claude from searching first (see _structure_kwargs)
+        if output_schema is not None:
+            kwargs["tools"] = [
+                *self._tools,
+                {
+                    "name": output_schema.__name__,
+                    "description": OUTPUT_TOOL_DESCRIPTION,
+                    "input_schema": output_schema.model_json_schema()
+                }
+            ]
+
+        # Mark the system prompt as a cache breakpoint so repeated calls reuse
+        # the provider's cached prefix (tools + system) instead of re-reading it
         if system_prompt:
-            kwargs["system"] = system_prompt
+            kwargs["system"] = [
+                {
+                    "type": "text",
+                    "text": system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ]
+
+        return kwargs
+
+    def _structure_kwargs(
+        self,
+        kwargs: dict,
+        result: WebSearchResponse,
+        output_schema: type[BaseModel]
+    ) -> dict:
+        """
+        Build a follow-up request forcing the output schema tool.
 
-        response = self.client.messages.create(**kwargs)
+        Used when the search answered in prose without calling the tool. The
+        answer is replayed as the assistant turn, followed by the sources it
+        cited (which live in citations, not in the text), and only the output
+        tool is offered, so no further searches run.
+        """
+        instruction = "Record this answer using only the facts stated above."
+        if result.citations:
+            sources = "\n".join(
+                f"{i}. {citation['title']}\n   URL: {citation['url']}"
+                for i, citation in enumerate(result.citations, 1)
+            )
+            instruction += f" Take any links from these sources cited by the answer:\n{sources}"
+
+        return {
+            **kwargs,
+            "messages": [
+                *kwargs["messages"],
+                {"role": "assistant", "content": result.final_output or "No answer was found."},
+                {"role": "user", "content": instruction}
+            ],
+            "tools": [kwargs["tools"][-1]],
+            "tool_choice": {"type": "tool", "name": output_schema.__name__}
+        }
 
+    def _parse_structured(self, response, output_schema: type[BaseModel]) -> Optional[BaseModel]:
+        """Return the output schema tool input from a Claude message, or None."""
+        for block in response.content:
+            if block.type == "tool_use" and block.name == output_schema.__name__:
+                try:
+                    return output_schema.model_validate(block.input)
+                except ValidationError:
+                    pass
+        return None
+
+    def _cache_get(
+        self,
+        kwargs: dict,
+        prompt: str,
+        system_prompt: Optional[str],
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> Optional[WebSearchResponse]:
+        """Return a cached response for the request, or None."""
+        cached = self._exact_cache_get(kwargs)
+        if cached is None:
+            cached = self._semantic_cache_get(prompt, system_prompt, output_schema)
+        return cached
+
+    def _exact_cache_get(self, kwargs: dict) -> Optional[WebSearchResponse]:
+        """Return the response cached for exactly this request, or None."""
+        # Sampled answers differ between calls, so only cache deterministic requests
+        # (no temperature means the API default of 1.0)
+        if self.temperature != 0 or self.cache is None:
+            return None
+        return self.cache.get(self.cache.make_key(kwargs))
+
+    def _uses_semantic_cache(self) -> bool:
+        """Whether lookups consult the prompt-similarity tier."""
+        return self.semantic_cache is not None and self.temperature == 0
+
+    def _semantic_cache_get(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> Optional[WebSearchResponse]:
+        """Return the response cached for a similar prompt, or None."""
+        if not self._uses_semantic_cache():
+            return None
+        namespace = LLMCache.make_key(self._build_kwargs("", system_prompt, output_schema))
+        return self.semantic_cache.get(prompt, namespace)
+
+    def _cache_set(
+        self,
+        kwargs: dict,
+        prompt: str,
+        system_prompt: Optional[str],
+        result: WebSearchResponse,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> None:
+        """Store a fresh response in the enabled caches."""
+        # A response missing the requested structured answer is a failure that a
+        # retry may fix, so it must not be replayed from the cache
+        if self.temperature != 0 or (output_schema is not None and result.structured is None):
+            return
+
+        if self.cache is not None:
+            self.cache.set(self.cache.make_key(kwargs), result)
+
+        if self.semantic_cache is not None:
+            namespace = LLMCache.make_key(self._build_kwargs("", system_prompt, output_schema))
+            self.semantic_cache.set(prompt, namespace, result)
+
+    def _parse_response(
+        self,
+        response,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """Extract the final answer and citations from a Claude message."""
         # Extract text and citations from response
         # Claude's response pattern: [thinking text blocks] -> [tool use] -> [results] -> [final answer]
         # We only want the last text block(s) which contain the final answer with citations
-        text_blocks = []
         citations = []
         citations_seen = set()  # Track unique citations by URL
 
-        for block in response.content:
-            # Collect all text blocks
+        # Walk back from the end collecting text blocks until the last search result
+        # If there are no search results this collects every text block
+        final_text_blocks = []
+        for block in reversed(response.content):
+            if block.type == "web_search_tool_result":
+                break
             if block.type == "text":
-                text_blocks.append(block)
+                final_text_blocks.append(block)
+        final_text_blocks.reverse()
 
-        # Use only the last text block(s) after the last search result
-        # Find the index of the last web_search_tool_result
-        last_search_idx = -1
-        for i, block in enumerate(response.content):
-            if block.type == "web_search_tool_result":
-                last_search_idx = i
+        final_output = "\n".join(block.text for block in final_text_blocks)
 
-        # Get text blocks that come after the last search
-        final_text_blocks = []
-        if last_search_idx >= 0:
-            for block in response.content[last_search_idx + 1:]:
-                if block.type == "text":
-                    final_text_blocks.append(block)
-        else:
-            # No search results found, use all text blocks
-            final_text_blocks = text_blocks
-
-        # Extract text and citations from final text blocks
-        final_text_parts = []
+        # Extract citations from final text blocks (Claude includes citations here)
         for block in final_text_blocks:
-            final_text_parts.append(block.text)
-
-            # Extract citations from text blocks (Claude includes citations here)
-            if hasattr(block, 'citations') and block.citations:
-                for citation in block.citations:
-                    if hasattr(citation, 'type') and citation.type == "web_search_result_location":
+            block_citations = getattr(block, 'citations', None)
+            if block_citations:
+                for citation in block_citations:
+                    if getattr(citation, 'type', None) == "web_search_result_location":
                         url = getattr(citation, 'url', None)
                         title = getattr(citation, 'title', None)
 
@@ -125,23 +306,230 @@ class ClaudeWebSearch:
                             citations.append({"url": url, "title": title})
                             citations_seen.add(url)
 
-        final_output = "\n".join(final_text_parts)
-        
-        # Print number of web searches performed
-        web_search_requests = 0
-        if hasattr(response, 'usage') and response.usage:
-            server_tool_use = getattr(response.usage, 'server_tool_use', None)
-            if server_tool_use:
-                web_search_requests = getattr(server_tool_use, 'web_search_requests', 0)
-        
-        print(f"🔍 Web searches performed: {web_search_requests}")
+        # Log number of web searches performed
+        if logger.isEnabledFor(logging.DEBUG):
+            web_search_requests = 0
+            usage = getattr(response, 'usage', None)
+            if usage:
+                server_tool_use = getattr(usage, 'server_tool_use', None)
+                if server_tool_use:
+                    web_search_requests = getattr(server_tool_use, 'web_search_requests', 0)
+
+            logger.debug("🔍 Web searches performed: %s", web_search_requests)
 
         return WebSearchResponse(
             final_output=final_output,
             citations=citations,
-            raw_response=response.model_dump()
+            raw_response=response,
+            structured=self._parse_structured(response, output_schema) if output_schema is not None else None
+        )
+
+    def search(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """
+        Execute a search query with Claude using web search tool.
+
+        Args:
+            prompt: The user prompt/question
+            system_prompt: Optional system prompt to guide Claude's behavior
+            output_schema: Optional pydantic model the model fills in via a tool call (forced
+                in a follow-up request if skipped); the parsed instance is returned as
+                WebSearchResponse.structured
+
+        Returns:
+            WebSearchResponse with final_output, citations, and raw response
+        """
+        kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+        cached = self._cache_get(kwargs, prompt, system_prompt, output_schema)
+        if cached is not None:
+            return cached
+
+        result = self._parse_response(self.client.messages.create(**kwargs), output_schema)
+        if output_schema is not None and result.structured is None:
+            followup = self.client.messages.create(**self._structure_kwargs(kwargs, result, output_schema))
+            result.structured = self._parse_structured(followup, output_schema)
+
+        self._cache_set(kwargs, prompt, system_prompt, result, output_schema)
+        return result
+
+    def search_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> Iterator[str | WebSearchResponse]:
+        """
+        Stream a search query, yielding text as soon as Claude produces it.
+
+        Args:
+            prompt: The user prompt/question
+            system_prompt: Optional system prompt to guide Claude's behavior
+
+        Yields:
+            Text chunks as they arrive, then a final WebSearchResponse parsed
+            from the complete message
+        """
+        kwargs = self._build_kwargs(prompt, system_prompt)
+        cached = self._cache_get(kwargs, prompt, system_prompt)
+        if cached is not None:
+            yield cached.final_output
+            yield cached
+            return
+
+        with self.client.messages.stream(**kwargs) as stream:
+            yield from stream.text_stream
+            response = stream.get_final_message()
+
+        result = self._parse_response(response)
+        self._cache_set(kwargs, prompt, system_prompt, result)
+        yield result
+
+    async def search_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """
+        Async variant of search() using the shared AsyncAnthropic client.
+
+        Args:
+            prompt: The user prompt/question
+            system_prompt: Optional system prompt to guide Claude's behavior
+            output_schema: Optional pydantic model the model fills in via a tool call (forced
+                in a follow-up request if skipped); the parsed instance is returned as
+                WebSearchResponse.structured
+
+        Returns:
+            WebSearchResponse with final_output, citations, and raw response
+        """
+        kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+        cached = self._exact_cache_get(kwargs)
+        if cached is None and self._uses_semantic_cache():
+            # Only pay for the embedding when the similarity tier is consulted, and
+            # fetch it off the event loop; the lookup and _cache_set reuse it
+            await asyncio.to_thread(self.semantic_cache.embed, prompt)
+            cached = self._semantic_cache_get(prompt, system_prompt, output_schema)
+        if cached is not None:
+            return cached
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(estimate_tokens(prompt + (system_prompt or "")))
+
+        result = self._parse_response(await self.async_client.messages.create(**kwargs), output_schema)
+        if output_schema is not None and result.structured is None:
+            followup_kwargs = self._structure_kwargs(kwargs, result, output_schema)
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(estimate_tokens(result.final_output + (system_prompt or "")))
+            followup = await self.async_client.messages.create(**followup_kwargs)
+            result.structured = self._parse_structured(followup, output_schema)
+
+        self._cache_set(kwargs, prompt, system_prompt, result, output_schema)
+        return result
+
+    async def search_many(
+        self,
+        prompts: list[str],
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 10,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> list[WebSearchResponse | BaseException]:
+        """
+        Run several searches concurrently.
+
+        Args:
+            prompts: The user prompts/questions
+            system_prompt: Optional system prompt shared by every prompt
+            max_concurrency: Maximum number of requests in flight at once
+            output_schema: Optional pydantic model filled in for every prompt (see search)
+
+        Returns:
+            One entry per prompt, in order; failed prompts hold the raised exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(prompt: str) -> WebSearchResponse:
+            async with semaphore:
+                return await self.search_async(prompt, system_prompt, output_schema)
+
+        return await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True)
+
+    def search_batch(
+        self,
+        prompts: list[str],
+        system_prompt: Optional[str] = None,
+        poll_interval: float = 30,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> list[WebSearchResponse | BaseException]:
+        """
+        Run searches through the Message Batches API.
+
+        Batches are billed at a discount and do not count against the
+        per-minute rate limits, but may take up to 24 hours to finish, so
+        this is only suited to bulk jobs that are not latency sensitive.
+        Cached prompts are answered from the cache and left out of the batch.
+
+        Args:
+            prompts: The user prompts/questions
+            system_prompt: Optional system prompt shared by every prompt
+            poll_interval: Seconds to wait between batch status checks
+            output_schema: Optional pydantic model filled in for every prompt (see search)
+
+        Returns:
+            One entry per prompt, in order; failed prompts hold the error
+        """
+        results: list[WebSearchResponse | BaseException] = [
+            RuntimeError(f"No result returned for prompt {i}") for i in range(len(prompts))
+        ]
+
+        # Only prompts missing from the cache are submitted
+        requests = {}
+        for i, prompt in enumerate(prompts):
+            kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+            cached = self._cache_get(kwargs, prompt, system_prompt, output_schema)
+            if cached is not None:
+                results[i] = cached
+            else:
+                requests[i] = kwargs
+
+        if not requests:
+            return results
+
+        batch = self.client.messages.batches.create(
+            requests=[{"custom_id": str(i), "params": kwargs} for i, kwargs in requests.items()]
         )
 
+        while batch.processing_status != "ended":
+            time.sleep(poll_interval)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        for entry in self.client.messages.batches.results(batch.id):
+            i = int(entry.custom_id)
+            if entry.result.type == "succeeded":
+                results[i] = self._parse_response(entry.result.message, output_schema)
+            else:
+                results[i] = RuntimeError(f"Batch request for prompt {i} {entry.result.type}")
+
+        for i, kwargs in requests.items():
+            result = results[i]
+            if not isinstance(result, WebSearchResponse):
+                continue
+
+            # Answers that skipped the output tool get a regular forced follow-up
+            if output_schema is not None and result.structured is None:
+                try:
+                    followup = self.client.messages.create(**self._structure_kwargs(kwargs, result, output_schema))
+                except APIError as e:
+                    results[i] = e
+                    continue
+                result.structured = self._parse_structured(followup, output_schema)
+
+            self._cache_set(kwargs, prompts[i], system_prompt, result, output_schema)
+
+        return results
 
 def main():
     import argparse
@@ -164,6 +552,10 @@ def main():
     
     args = parser.parse_args()
 
+    # Show the per-call web search count
+    logging.basicConfig(format="%(message)s")
+    logger.setLevel(logging.DEBUG)
+
     claude = ClaudeWebSearch(
         max_uses=args.max_uses,
     )
@@ -174,8 +566,8 @@ def main():
     response = claude.search(args.prompt)
 
     print("Raw response saved to tmp/claude_raw.json")
-    with open("tmp/claude_raw.json", "w", encoding="utf-8") as f:
-        json.dump(response.raw_response, f, indent=2)
+    with open("tmp/claude_raw.json", "wb") as f:
+        f.write(response.raw_json_bytes)
 
     print("Final output:")
     print(response.final_output)
@@ -5,104 +5,531 @@ This module provides a helper class to interact with OpenAI using the OpenAI SDK
 with built-in web search capabilities and citation extraction using the Responses API.
 """
 
+import asyncio
 import json
-import sys
-from pathlib import Path
-import warnings
-from typing import Optional
+import time
+from functools import cache
+from typing import Optional, TypedDict
 
-from openai import OpenAI
+import httpx
+from openai import APIError, AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI, pydantic_function_tool
+from openai.types.responses import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, ValidationError, with_config
 
+from src.ai.cache import LLMCache, SemanticCache
+from src.ai.ratelimit import RateLimiter, estimate_tokens
 from src.ai.response import WebSearchResponse
 
 
+# Connection pool shared by every OpenAIWebSearch instance so repeated
+# helpers reuse warm keep-alive connections instead of new TLS handshakes
+HTTP_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=50,
+    keepalive_expiry=30.0
+)
+HTTP_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# search_multi falls back to one request per prompt above these sizes
+MULTI_MAX_PROMPTS = 8
+MULTI_MAX_CHARS = 16_000  # ~4k input tokens
+
+
+@with_config(ConfigDict(extra="forbid"))
+class MultiSource(TypedDict):
+    """One source backing a search_multi answer."""
+    url: str
+    title: str
+
+
+@with_config(ConfigDict(extra="forbid"))
+class MultiAnswer(TypedDict):
+    """The answer to one search_multi prompt, identified by its index."""
+    index: int
+    answer: str
+    sources: list[MultiSource]
+
+
+@with_config(ConfigDict(extra="forbid"))
+class MultiAnswers(TypedDict):
+    """Combined search_multi reply."""
+    answers: list[MultiAnswer]
+
+
+# Parses the search_multi reply straight from JSON in pydantic-core
+MULTI_ANSWERS = TypeAdapter(MultiAnswers)
+
+# Strict structured output format for the same shape, so the two cannot drift
+MULTI_ANSWER_FORMAT = {
+    "type": "json_schema",
+    "name": "answers",
+    "strict": True,
+    "schema": MULTI_ANSWERS.json_schema()
+}
+
+
+@cache
+def get_client() -> OpenAI:
+    """Return the process-wide OpenAI client, created on first use."""
+    return OpenAI(
+        http_client=DefaultHttpxClient(limits=HTTP_LIMITS),
+        timeout=HTTP_TIMEOUT
+    )
+
+
+@cache
+def get_async_client() -> AsyncOpenAI:
+    """Return the process-wide AsyncOpenAI client, created on first use."""
+    return AsyncOpenAI(
+        http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS),
+        timeout=HTTP_TIMEOUT
+    )
+
+
+def prewarm() -> None:
+    """
+    Open a connection to the OpenAI API ahead of the first search.
+
+    Call once at service startup so the TLS handshake is already done and a
+    keep-alive connection is waiting in the shared pool. Failures are ignored;
+    the first real request simply pays the connection cost instead.
+    """
+    try:
+        get_client().models.list()
+    except APIError:
+        pass
+
 
 class OpenAIWebSearch:
     """Helper class for OpenAI with web search capabilities using Responses API."""
 
     def __init__(
         self,
-        model: str = "gpt-5.1"
+        model: str = "gpt-5.1",
+        cache: Optional[LLMCache] = None,
+        semantic_cache: Optional[SemanticCache] = None,
+        rate_limiter: Optional[RateLimiter] = None
     ):
         """
         Initialize OpenAI with web search support.
 
         Args:
             model: OpenAI model name (default: gpt-5.1)
+            cache: Optional response cache; identical requests skip the API call
+            semantic_cache: Optional cache that also matches paraphrased prompts
+            rate_limiter: Optional client-side pacing for async calls,
+                e.g. RateLimiter.for_provider("openai")
         """
         self.model = model
-        self.client = OpenAI()
+        self.cache = cache
+        self.semantic_cache = semantic_cache
+        self.rate_limiter = rate_limiter
 
-    def search(self, prompt: str, system_prompt: Optional[str] = None) -> WebSearchResponse:
-        """
-        Execute a search query with OpenAI using web search tool via Responses API.
+        # Request arguments shared by every call, with web search enabled
+        self._tools = [{"type": "web_search"}]
+        self._base_kwargs = {
+            "model": model,
+            "tools": self._tools,
+            "tool_choice": "auto",
+            # Return every source consulted, not only the ones cited inline
+            "include": ["web_search_call.action.sources"],
+        }
 
-        Args:
-            prompt: The user prompt/question
-            system_prompt: Optional system prompt to guide OpenAI's behavior
+        self.client = get_client()
+        self.async_client = get_async_client()
 
-        Returns:
-            WebSearchResponse with final_output, citations, and raw response
-        """
-        # Combine system prompt and user prompt if system prompt is provided
-        full_input = prompt
+    def _build_kwargs(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> dict:
+        """Build the responses.create arguments for a single prompt."""
+        kwargs = {**self._base_kwargs, "input": prompt}
+
+        # Send the system prompt as its own leading message so it forms a stable
+        # prefix that the provider's automatic prompt caching can reuse
         if system_prompt:
-            full_input = f"{system_prompt}\n\n{prompt}"
+            kwargs["input"] = [
+                {"role": "developer", "content": system_prompt},
+                {"role": "user", "content": prompt},
+            ]
 
-        # Make API call with web search enabled using Responses API
-        response = self.client.responses.create(
-            model=self.model,
-            input=full_input,
-            tools=[{"type": "web_search"}],
-        )
+        # Enforce the output schema natively with a strict JSON schema response
+        # format; web search still runs first and the final message is the JSON
+        if output_schema is not None:
+            function = pydantic_function_tool(output_schema)["function"]
+            kwargs["text"] = {
+                "format": {
+                    "type": "json_schema",
+                    "name": function["name"],
+                    "schema": function["parameters"],
+                    "strict": True
+                }
+            }
+
+        return kwargs
 
+    def _cache_get(
+        self,
+        kwargs: dict,
+        prompt: str,
+        system_prompt: Optional[str],
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> Optional[WebSearchResponse]:
+        """Return a cached response for the request, or None."""
+        cached = self._exact_cache_get(kwargs)
+        if cached is None:
+            cached = self._semantic_cache_get(prompt, system_prompt, output_schema)
+        return cached
+
+    def _exact_cache_get(self, kwargs: dict) -> Optional[WebSearchResponse]:
+        """Return the response cached for exactly this request, or None."""
+        if self.cache is None:
+            return None
+        return self.cache.get(self.cache.make_key(kwargs))
+
+    def _uses_semantic_cache(self) -> bool:
+        """Whether lookups consult the prompt-similarity tier."""
+        return self.semantic_cache is not None
+
+    def _semantic_cache_get(
+        self,
+        prompt: str,
+        system_prompt: Optional[str],
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> Optional[WebSearchResponse]:
+        """Return the response cached for a similar prompt, or None."""
+        if not self._uses_semantic_cache():
+            return None
+        namespace = LLMCache.make_key(self._build_kwargs("", system_prompt, output_schema))
+        return self.semantic_cache.get(prompt, namespace)
+
+    def _cache_set(
+        self,
+        kwargs: dict,
+        prompt: str,
+        system_prompt: Optional[str],
+        result: WebSearchResponse,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> None:
+        """Store a fresh response in the enabled caches."""
+        # A response missing the requested structured answer is a failure that a
+        # retry may fix, so it must not be replayed from the cache
+        if output_schema is not None and result.structured is None:
+            return
+
+        if self.cache is not None:
+            self.cache.set(self.cache.make_key(kwargs), result)
+
+        if self.semantic_cache is not None:
+            namespace = LLMCache.make_key(self._build_kwargs("", system_prompt, output_schema))
+            self.semantic_cache.set(prompt, namespace, result)
+
+    def _parse_response(
+        self,
+        response,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """Extract the final answer and citations from a Responses API result."""
         # Extract text and citations from response
         final_output = ""
         citations = []
-
+        citations_seen = set()  # Track unique citations by URL
 
         # Extract citations from annotations in message content blocks
-        if hasattr(response, 'output') and response.output:
-            for item in response.output:
+        output = getattr(response, 'output', None)
+        if output:
+            for item in output:
                 # Only look for message items with content
-                if hasattr(item, 'type') and item.type == "message":
-                    if hasattr(item, 'content') and item.content:
-                        for content_block in item.content:
+                if getattr(item, 'type', None) == "message":
+                    content = getattr(item, 'content', None)
+                    if content:
+                        for content_block in content:
                             # Extract text if not already set
-                            if not final_output and hasattr(content_block, 'text'):
-                                final_output = content_block.text
+                            if not final_output:
+                                final_output = getattr(content_block, 'text', "")
 
                             # Extract citations from annotations
-                            if hasattr(content_block, 'annotations') and content_block.annotations:
-                                for annotation in content_block.annotations:
-                                    if hasattr(annotation, 'type') and annotation.type == "url_citation":
-                                        citation = {}
-                                        if hasattr(annotation, 'url'):
-                                            citation['url'] = annotation.url
-                                        if hasattr(annotation, 'title'):
-                                            citation['title'] = annotation.title
-                                        # Only add if we have both url and title
-                                        if citation.get('url') and citation.get('title'):
-                                            if citation not in citations:
-                                                citations.append(citation)
-
-        # Serialize response without triggering pydantic warnings
-        raw_response = None
-        try:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                raw_response = response.model_dump() if hasattr(response, 'model_dump') else dict(response)
-        except Exception:
-            raw_response = response
+                            annotations = getattr(content_block, 'annotations', None)
+                            if annotations:
+                                for annotation in annotations:
+                                    if getattr(annotation, 'type', None) == "url_citation":
+                                        url = getattr(annotation, 'url', None)
+                                        title = getattr(annotation, 'title', None)
+
+                                        # Only add unique citations with both url and title
+                                        if url and title and url not in citations_seen:
+                                            citations.append({"url": url, "title": title})
+                                            citations_seen.add(url)
+
+        # The answer text is the schema-conforming JSON when an output schema is set
+        structured = None
+        if output_schema is not None and final_output:
+            try:
+                structured = output_schema.model_validate_json(final_output)
+            except ValidationError:
+                pass
 
         return WebSearchResponse(
             final_output=final_output,
             citations=citations,
-            raw_response=raw_response
+            raw_response=response,
+            structured=structured
+        )
+
+    def search(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """
+        Execute a search query with OpenAI using web search tool via Responses API.
+
+        Args:
+            prompt: The user prompt/question
+            system_prompt: Optional system prompt to guide OpenAI's behavior
+            output_schema: Optional pydantic model the answer is constrained to (strict
+                JSON schema output); the parsed instance is returned as WebSearchResponse.structured
+
+        Returns:
+            WebSearchResponse with final_output, citations, and raw response
+        """
+        kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+        cached = self._cache_get(kwargs, prompt, system_prompt, output_schema)
+        if cached is not None:
+            return cached
+
+        result = self._parse_response(self.client.responses.create(**kwargs), output_schema)
+        self._cache_set(kwargs, prompt, system_prompt, result, output_schema)
+        return result
+
+    async def search_async(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> WebSearchResponse:
+        """
+        Async variant of search() using the shared AsyncOpenAI client.
+
+        Args:
+            prompt: The user prompt/question
+            system_prompt: Optional system prompt to guide OpenAI's behavior
+            output_schema: Optional pydantic model the answer is constrained to (strict
+                JSON schema output); the parsed instance is returned as WebSearchResponse.structured
+
+        Returns:
+            WebSearchResponse with final_output, citations, and raw response
+        """
+        kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+        cached = self._exact_cache_get(kwargs)
+        if cached is None and self._uses_semantic_cache():
+            # Only pay for the embedding when the similarity tier is consulted, and
+            # fetch it off the event loop; the lookup and _cache_set reuse it
+            await asyncio.to_thread(self.semantic_cache.embed, prompt)
+            cached = self._semantic_cache_get(prompt, system_prompt, output_schema)
+        if cached is not None:
+            return cached
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(estimate_tokens(prompt + (system_prompt or "")))
+
+        result = self._parse_response(await self.async_client.responses.create(**kwargs), output_schema)
+        self._cache_set(kwargs, prompt, system_prompt, result, output_schema)
+        return result
+
+    async def search_many(
+        self,
+        prompts: list[str],
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 10,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> list[WebSearchResponse | BaseException]:
+        """
+        Run several searches concurrently.
+
+        Args:
+            prompts: The user prompts/questions
+            system_prompt: Optional system prompt shared by every prompt
+            max_concurrency: Maximum number of requests in flight at once
+            output_schema: Optional pydantic model filled in for every prompt (see search)
+
+        Returns:
+            One entry per prompt, in order; failed prompts hold the raised exception
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def run(prompt: str) -> WebSearchResponse:
+            async with semaphore:
+                return await self.search_async(prompt, system_prompt, output_schema)
+
+        return await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True)
+
+    async def search_multi(
+        self,
+        prompts: list[str],
+        system_prompt: Optional[str] = None,
+        max_concurrency: int = 10
+    ) -> list[WebSearchResponse | BaseException]:
+        """
+        Answer several prompts with a single Responses API request.
+
+        Useful when bound by the requests-per-minute limit rather than the
+        tokens-per-minute limit. Batches too large for one request, and any
+        prompt the model leaves unanswered, go through search_many instead.
+
+        Args:
+            prompts: The user prompts/questions
+            system_prompt: Optional system prompt shared by every prompt
+            max_concurrency: Concurrency used when falling back to search_many
+
+        Returns:
+            One entry per prompt, in order; failed prompts hold the raised exception
+        """
+        if (
+            len(prompts) > MULTI_MAX_PROMPTS
+            or sum(len(prompt) for prompt in prompts) > MULTI_MAX_CHARS
+        ):
+            return await self.search_many(prompts, system_prompt, max_concurrency)
+
+        full_input = (
+            "Answer each of the following questions independently. Return one "
+            "entry per question, using the question's number as its index, "
+            "with the sources that support that answer.\n\n"
+            + "\n---\n".join(f"[{i}] {prompt}" for i, prompt in enumerate(prompts))
         )
+        kwargs = self._build_kwargs(full_input, system_prompt)
+        kwargs["text"] = {"format": MULTI_ANSWER_FORMAT}
+
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire(estimate_tokens(full_input + (system_prompt or "")))
+
+        response = await self.async_client.responses.create(**kwargs)
+
+        results: list[WebSearchResponse | BaseException | None] = [None] * len(prompts)
+        try:
+            answers = MULTI_ANSWERS.validate_json(response.output_text)["answers"]
+        except ValidationError:
+            answers = []
+
+        for answer in answers:
+            i = answer["index"]
+            if 0 <= i < len(prompts):
+                results[i] = WebSearchResponse(
+                    final_output=answer["answer"],
+                    citations=[
+                        {"url": source["url"], "title": source["title"]}
+                        for source in answer["sources"]
+                        if source["url"] and source["title"]
+                    ],
+                    raw_response=response
+                )
+
+        # Retry anything the combined answer did not cover one prompt at a time
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            retried = await self.search_many(
+                [prompts[i] for i in missing], system_prompt, max_concurrency
+            )
+            for i, result in zip(missing, retried):
+                results[i] = result
+
+        return results
+
+    def search_batch(
+        self,
+        prompts: list[str],
+        system_prompt: Optional[str] = None,
+        poll_interval: float = 30,
+        output_schema: Optional[type[BaseModel]] = None
+    ) -> list[WebSearchResponse | BaseException]:
+        """
+        Run searches through the Batch API.
+
+        Batches are billed at a discount and do not count against the
+        per-minute rate limits, but may take up to 24 hours to finish, so
+        this is only suited to bulk jobs that are not latency sensitive.
+        Cached prompts are answered from the cache and left out of the batch.
+
+        Args:
+            prompts: The user prompts/questions
+            system_prompt: Optional system prompt shared by every prompt
+            poll_interval: Seconds to wait between batch status checks
+            output_schema: Optional pydantic model filled in for every prompt (see search)
+
+        Returns:
+            One entry per prompt, in order; failed prompts hold a RuntimeError
+        """
+        results: list[WebSearchResponse | BaseException] = [
+            RuntimeError(f"No result returned for prompt {i}") for i in range(len(prompts))
+        ]
+
+        # Only prompts missing from the cache are submitted
+        requests = {}
+        for i, prompt in enumerate(prompts):
+            kwargs = self._build_kwargs(prompt, system_prompt, output_schema)
+            cached = self._cache_get(kwargs, prompt, system_prompt, output_schema)
+            if cached is not None:
+                results[i] = cached
+            else:
+                requests[i] = kwargs
+
+        if not requests:
+            return results
+
+        # One Responses API request per line
+        lines = [
+            json.dumps({
+                "custom_id": str(i),
+                "method": "POST",
+                "url": "/v1/responses",
+                "body": kwargs,
+            })
+            for i, kwargs in requests.items()
+        ]
+        input_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/responses",
+            completion_window="24h"
+        )
+
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+
+        for i in requests:
+            results[i] = RuntimeError(f"No result returned for prompt {i} (batch {batch.id} {batch.status})")
+
+        # Successful requests come back in the output file and failed ones in the
+        # error file; a batch that failed as a whole may have neither
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                i = int(entry["custom_id"])
+                response = entry.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[i] = self._parse_response(Response.construct(**response["body"]), output_schema)
+                    self._cache_set(requests[i], prompts[i], system_prompt, results[i], output_schema)
+                else:
+                    error = entry.get("error") or (response.get("body") or {}).get("error")
+                    results[i] = RuntimeError(f"Batch request for prompt {i} failed: {error}")
+
+        return results
 
 
 def main():
+    import sys
     from dotenv import load_dotenv
     load_dotenv()
 
@@ -119,8 +546,8 @@ def main():
     response = openai_search.search(prompt)
 
     print("Raw response saved to tmp/openai_raw.json")
-    with open("tmp/openai_raw.json", "w", encoding="utf-8") as f:
-        json.dump(response.raw_response, f, indent=2)
+    with open("tmp/openai_raw.json", "wb") as f:
+        f.write(response.raw_json_bytes)
 
     print("Final output:")
     print(response.final_output)
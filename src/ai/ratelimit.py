@@ -0,0 +1,91 @@
+"""
+Client-side rate limiting for async web search calls.
+
+Pacing requests to stay under the provider's requests-per-minute and
+tokens-per-minute limits keeps throughput at the ceiling instead of bursting
+into 429 errors and retry backoff.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+# Tier 1 limits per provider: (requests per minute, input tokens per minute)
+PROVIDER_LIMITS = {
+    "anthropic": (50, 30_000),
+    "openai": (500, 500_000),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for rate limiting (~4 characters per token)."""
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Async token bucket refilling at rate tokens per period seconds."""
+
+    def __init__(self, rate: float, period: float = 60.0):
+        """
+        Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per period (also the bucket capacity)
+            period: Refill period in seconds
+        """
+        self.rate = rate
+        self.period = period
+        self._tokens = float(rate)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate / self.period)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1) -> None:
+        """Wait until amount tokens are available, then take them."""
+        # A single oversized request may use the whole bucket but never more
+        amount = min(amount, self.rate)
+        async with self._lock:
+            self._refill()
+            while self._tokens < amount:
+                await asyncio.sleep((amount - self._tokens) * self.period / self.rate)
+                self._refill()
+            self._tokens -= amount
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one provider."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute: Maximum requests started per minute
+            tokens_per_minute: Optional maximum estimated input tokens per minute
+        """
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+
+    @classmethod
+    def for_provider(cls, provider: str, requests_per_minute: Optional[float] = None) -> "RateLimiter":
+        """
+        Create a limiter with the default limits for "anthropic" or "openai".
+
+        Args:
+            provider: Key into PROVIDER_LIMITS
+            requests_per_minute: Optional override for the requests limit only;
+                the provider's tokens-per-minute limit is kept
+        """
+        default_rpm, tokens_per_minute = PROVIDER_LIMITS[provider]
+        return cls(requests_per_minute or default_rpm, tokens_per_minute)
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until a request using roughly tokens input tokens may start."""
+        await self.requests.acquire()
+        if self.tokens is not None and tokens:
+            await self.tokens.acquire(tokens)
@@ -2,16 +2,49 @@
 Unified response format for web search across different AI providers.
 """
 
-from typing import Any
-from dataclasses import dataclass
+import json
+from typing import Any, Optional
+from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True)
 class WebSearchResponse:
     """Unified response format for web search across different AI providers."""
     final_output: str  # The final generated text response
     citations: list[dict[str, str]]  # List of citations with 'url' and 'title'
-    raw_response: Any  # The complete raw response from the API
+    raw_response: Any  # The complete raw response object from the API
+    structured: Any = None  # Parsed output_schema instance, if one was requested and returned
+    _raw_dict: Any = field(default=None, init=False, repr=False, compare=False)
+    _raw_json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def raw_dict(self) -> Any:
+        """Raw response as plain Python data, serialized on first access."""
+        if self._raw_dict is None:
+            self._raw_dict = self._dump_raw()
+        return self._raw_dict
+
+    def _dump_raw(self) -> Any:
+        try:
+            if hasattr(self.raw_response, 'model_dump'):
+                # Raw SDK responses can hold values that don't match their declared
+                # types; the dump is best-effort, so skip the serializer warnings
+                return self.raw_response.model_dump(warnings=False)
+            return dict(self.raw_response)
+        except Exception:
+            return self.raw_response
+
+    @property
+    def raw_json_bytes(self) -> bytes:
+        """Raw response as JSON, serialized on first access without an intermediate dict."""
+        if self._raw_json is None:
+            serializer = getattr(self.raw_response, '__pydantic_serializer__', None)
+            if serializer is not None:
+                # pydantic-core writes JSON straight from the model
+                self._raw_json = serializer.to_json(self.raw_response, warnings=False)
+            else:
+                self._raw_json = json.dumps(self.raw_dict, default=str).encode("utf-8")
+        return self._raw_json
 
     @property
     def text(self) -> str:
@@ -6,97 +6,88 @@ investments in the past 5 years using GPT-4 and Claude Sonnet 4.5 with web searc
 """
 
 import argparse
+import asyncio
 import csv
-import os
+import logging
+import logging.handlers
+import queue
+import re
+import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Iterator, TextIO, TypeVar
 
+import anthropic
+import openai
 from dotenv import load_dotenv
-from openai import OpenAI
 from pydantic import BaseModel, Field
-from rich import print_json
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as async_tqdm
 
-from src.ai import ClaudeWebSearch, OpenAIWebSearch
+from src.ai import ClaudeWebSearch, LLMCache, OpenAIWebSearch, RateLimiter, SQLiteCacheBackend
 
 
 # Load environment variables from .env file
 load_dotenv()
 
+T = TypeVar("T")
+
+logger = logging.getLogger("vc_research")
+
+# Output CSV columns
+CSV_FIELDNAMES = ['VC Firm Name', 'Has Qualifying Investment', 'Summary', 'Supporting Links']
+
+# Rows are written in chunks of this many once a run exceeds CSV_BUFFER_THRESHOLD firms;
+# smaller runs write every row as soon as it completes
+CSV_FLUSH_ROWS = 32
+CSV_BUFFER_THRESHOLD = 100
+
+# Research responses are cached here across runs (see --no-cache)
+CACHE_PATH = ".vc_cache.db"
+
+# Attempts per research call before a firm is given up on; the research client
+# has SDK retries turned off so this is the only retry layer
+MAX_API_ATTEMPTS = 5
+# Pause used when a 429 response carries no reset header
+DEFAULT_RATE_LIMIT_PAUSE = 30.0
+
+# Errors retried after a short per-firm backoff, as the SDKs would
+TRANSIENT_ERRORS = (
+    openai.APIConnectionError,
+    openai.InternalServerError,
+    anthropic.APIConnectionError,
+    anthropic.InternalServerError,
+)
+
 class StructuredInvestmentOutput(BaseModel):
     """Structured output with Yes/No, summary, and credible links."""
     has_qualifying_investment: bool = Field(
         description="Whether the VC lead or co-lead $100M+ round in the last 5 years"
     )
     summary: str = Field(
-        description="Max 1-2 line summary of the investment, including round type, date, invested company name, any co-investor"
+        description="Max 1-2 line summary of the investment, including round type, date, invested company name, any co-investor; "
+                    "if there is none, a brief explanation of what was searched"
     )
     links: list[str] = Field(
         max_length=2,
-        description="Max 1-2 links from the most credible sources (press release, TechCrunch, Forbes or any top rated business news website)"
+        description="Max 1-2 links from the most credible sources (press release, TechCrunch, Forbes or any top rated business news website); "
+                    "empty if there is no qualifying investment"
     )
 
 
-def create_structured_output(
-    research_summary: str,
-    supporting_links: list[str]
-) -> StructuredInvestmentOutput:
+def create_research_system_prompt() -> str:
     """
-    Create structured output from research summary and links.
+    Create the research instructions shared by every firm.
 
-    Args:
-        research_summary: The research summary text
-        supporting_links: List of supporting URLs
-
-    Returns:
-        StructuredInvestmentOutput with yes/no, summary, and top credible links
+    The firm name is left out so this prefix is byte-identical across firms
+    and can be served from the provider's prompt cache.
     """
-    client = OpenAI()
-
-    # Format links with title and URL for better selection
-    formatted_links = []
-    for link in supporting_links:
-        if isinstance(link, dict):
-            title = link.get('title', 'No title')
-            url = link.get('url', '')
-            formatted_links.append(f"- {title}\n  URL: {url}")
-        else:
-            formatted_links.append(f"- {link}")
-
-    prompt = f"""Given the following research summary and supporting links, extract and structure the information:
-
-RESEARCH SUMMARY:
-{research_summary}
-
-SUPPORTING LINKS:
-{chr(10).join(formatted_links)}
-
-Please extract:
-1. Whether the VC led or co-led a $100M+ round in the last 5 years (Yes/No)
-2. A concise 1-2 line summary including: round type, date, invested company name, and any co-investors
-3. The 1-2 most credible links supporting (prioritize press releases, TechCrunch, Forbes, or other top business news sources)
-
-If the answer is NO, provide a brief explanation in the summary field and return empty links list."""
-
-    completion = client.beta.chat.completions.parse(
-        model="gpt-5-mini",
-        messages=[
-            {"role": "system", "content": "You are a financial research analyst specializing in venture capital investments."},
-            {"role": "user", "content": prompt}
-        ],
-        response_format=StructuredInvestmentOutput
-    )
-
-    return completion.choices[0].message.parsed
-
-
-def create_research_prompt(vc_firm_name: str) -> str:
-    """Create the research prompt for the models."""
 
     current_date = datetime.now()
     five_years_ago = current_date - timedelta(days=5*365)
 
-    prompt = f"""You are a professional investment research analyst. Your task is to research whether the venture capital firm "{vc_firm_name}" has led or co-led any $100M+ Series B, Series C, or Series D investment within the past 5 years (from {five_years_ago.strftime('%B %Y')} to {current_date.strftime('%B %Y')}).
+    prompt = f"""You are a professional investment research analyst. Your task is to research whether the venture capital firm named in the user message has led or co-led any $100M+ Series B, Series C, or Series D investment within the past 5 years (from {five_years_ago.strftime('%B %Y')} to {current_date.strftime('%B %Y')}).
 
 CRITICAL RESEARCH REQUIREMENTS:
 
@@ -112,27 +103,75 @@ CRITICAL RESEARCH REQUIREMENTS:
 3. VERIFICATION REQUIREMENTS:
    - The investment must be $100M or more
    - Must be Series B, Series C, or Series D round (not Series A, seed, or later stages)
-   - {vc_firm_name} must have LED or CO-LED the round (not just participated)
+   - The firm must have LED or CO-LED the round (not just participated)
    - Must have occurred within the past 5 years
    - Must be verified by at least one credible source URL
 
-
-5. OUTPUT REQUIREMENTS:
-   - Provide a clear 2-3 sentence summary if a qualifying investment is found
-   - Include: invested company name, round type, amount, date, and whether they led or co-led
-   - List only the most relevant source URLs (3-5 maximum from official sources or major publications)
-   - If no qualifying investment found, clearly state this and explain what was searched
+4. OUTPUT REQUIREMENTS:
+   - has_qualifying_investment: true only if a qualifying investment is verified by a credible source
+   - summary: 1-2 lines with the invested company name, round type, amount, date, whether the firm led or co-led, and any co-investors
+   - links: only the 1-2 most credible source URLs (prioritize press releases, TechCrunch, Forbes, or other top business news sources)
+   - If no qualifying investment is found, briefly explain what was searched in the summary and return an empty links list
 
 IMPORTANT: Be thorough but precise. Only report investments you can verify through credible web sources found in your search. If sources conflict, prioritize the firm's official press releases and major business publications.
 
 OUTPUT FORMAT:
-- Start with "YES" or "NO" to indicate if a qualifying investment was found
-- Then provide the summary and source URLs
-- Do NOT show your search process or thinking steps
+- Return the answer as the structured output with exactly these fields: has_qualifying_investment, summary, links
+- Never include more than 2 links
+- Do NOT show your search process or thinking steps"""
+
+    return prompt
+
+
+def create_research_prompt(vc_firm_name: str) -> str:
+    """Create the per-firm research request sent after the system prompt."""
+    return f"""Research firm: {vc_firm_name}
 
 Begin your research now using web search to find qualifying investments by {vc_firm_name}."""
 
-    return prompt
+
+class TqdmHandler(logging.Handler):
+    """Writes log records above the progress bar instead of through it."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            tqdm.write(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+
+def setup_logging(level: int) -> logging.handlers.QueueListener:
+    """
+    Route vc_research and src.ai log records through a queue drained by a background thread.
+
+    Research tasks only enqueue records, so they never block on terminal
+    output or format tracebacks for levels that are filtered out. The caller
+    stops the returned listener to flush remaining records.
+    """
+    log_queue = queue.SimpleQueue()
+    for target in (logger, logging.getLogger("src.ai")):
+        target.addHandler(logging.handlers.QueueHandler(log_queue))
+        target.setLevel(level)
+        target.propagate = False
+
+    listener = logging.handlers.QueueListener(log_queue, TqdmHandler())
+    listener.start()
+    return listener
+
+
+def normalize_firm_names(names: Iterable[str], canonicalize: bool = False) -> list[str]:
+    """
+    Collapse whitespace in firm names and drop duplicates, keeping input order.
+
+    With canonicalize, names differing only in case also count as duplicates;
+    the first spelling seen is the one researched and written to the CSV.
+    """
+    firms = {}
+    for name in names:
+        name = " ".join(name.split())
+        if name:
+            firms.setdefault(name.casefold() if canonicalize else name, name)
+    return list(firms.values())
 
 
 def get_processed_firms(csv_path: str) -> set[str]:
@@ -140,31 +179,266 @@ def get_processed_firms(csv_path: str) -> set[str]:
     if not Path(csv_path).exists():
         return set()
 
-    processed = set()
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            processed.add(row['VC Firm Name'])
-    return processed
+    # Plain csv.reader avoids building a dict per row just to read one column;
+    # the csv module is still needed since summaries may contain quoted commas/newlines
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return set()
+
+        column = header.index('VC Firm Name')
+        return {row[column] for row in reader if len(row) > column}
+
+
+class BufferedCsvWriter:
+    """Collects CSV rows and writes them flush_rows at a time in one writerows call."""
+
+    def __init__(self, f: TextIO, flush_rows: int = 1):
+        """
+        Initialize the writer.
+
+        Args:
+            f: Open output file
+            flush_rows: Rows collected before they are written and flushed to disk
+        """
+        self.file = f
+        self.writer = csv.DictWriter(f, fieldnames=CSV_FIELDNAMES)
+        self.flush_rows = flush_rows
+        self.pending: list[dict] = []
+
+    def writerow(self, row: dict) -> None:
+        self.pending.append(row)
+        if len(self.pending) >= self.flush_rows:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Write every pending row and push them to disk.
+
+        A failed write is logged and loses only the firms in this chunk, so
+        the run carries on and later chunks are still written.
+        """
+        rows, self.pending = self.pending, []
+        try:
+            if rows:
+                self.writer.writerows(rows)
+            self.file.flush()
+        except OSError:
+            firms = ", ".join(row['VC Firm Name'] for row in rows)
+            logger.exception("❌ Error writing %s to the output CSV", firms or "the header")
 
 
-def append_to_csv(csv_path: str, vc_firm: str, structured_output: StructuredInvestmentOutput):
-    """Append research result to CSV file."""
-    file_exists = Path(csv_path).exists()
+@contextmanager
+def open_csv_writer(csv_path: str | None, flush_rows: int = 1) -> Iterator[BufferedCsvWriter | None]:
+    """
+    Open the output CSV once for the whole run, writing the header if it is new.
 
+    Yields None when no output CSV was requested. Rows reach disk in chunks of
+    flush_rows (every row by default), and any partial chunk is written on exit.
+    """
+    if not csv_path:
+        yield None
+        return
+
+    file_exists = Path(csv_path).exists()
     with open(csv_path, 'a', newline='', encoding='utf-8') as f:
-        fieldnames = ['VC Firm Name', 'Has Qualifying Investment', 'Summary', 'Supporting Links']
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = BufferedCsvWriter(f, flush_rows)
 
         if not file_exists:
-            writer.writeheader()
+            writer.writer.writeheader()
+            writer.flush()
 
-        writer.writerow({
-            'VC Firm Name': vc_firm,
-            'Has Qualifying Investment': 'Yes' if structured_output.has_qualifying_investment else 'No',
-            'Summary': structured_output.summary,
-            'Supporting Links': ' | '.join(structured_output.links) if structured_output.links else ''
-        })
+        try:
+            yield writer
+        finally:
+            writer.flush()
+
+
+def append_to_csv(writer: BufferedCsvWriter, vc_firm: str, structured_output: StructuredInvestmentOutput):
+    """Append research result to CSV file."""
+    writer.writerow({
+        'VC Firm Name': vc_firm,
+        'Has Qualifying Investment': 'Yes' if structured_output.has_qualifying_investment else 'No',
+        'Summary': structured_output.summary,
+        'Supporting Links': ' | '.join(structured_output.links) if structured_output.links else ''
+    })
+
+
+def rate_limit_pause(error: openai.RateLimitError | anthropic.RateLimitError) -> float:
+    """Seconds to wait before retrying, read from the 429 response headers."""
+    headers = error.response.headers
+
+    retry_after = headers.get("retry-after")
+    if retry_after:
+        try:
+            return float(retry_after)
+        except ValueError:
+            pass
+
+    # OpenAI reports each reset as a duration such as "1m30s" or "250ms"; wait
+    # for the later one, since a tokens-per-minute limit often outlasts the
+    # requests-per-minute reset
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    resets = []
+    for header in ("x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        parts = re.findall(r"([\d.]+)(ms|h|m|s)", headers.get(header, ""))
+        if parts:
+            resets.append(sum(float(value) * units[unit] for value, unit in parts))
+
+    return max(resets, default=DEFAULT_RATE_LIMIT_PAUSE)
+
+
+class RateLimitPause:
+    """Shared point in time before which no firm may start a request."""
+
+    def __init__(self):
+        self.resume_at = 0.0
+
+    def extend(self, seconds: float) -> None:
+        """Hold every firm for at least seconds from now; never shortens a pause."""
+        self.resume_at = max(self.resume_at, time.monotonic() + seconds)
+
+    async def wait(self) -> None:
+        """Sleep until the pause, including any extension made meanwhile, is over."""
+        while (remaining := self.resume_at - time.monotonic()) > 0:
+            await asyncio.sleep(remaining)
+
+
+async def call_with_rate_limit(pause: RateLimitPause, call: Callable[[], Awaitable[T]]) -> T:
+    """
+    Await call(), pausing every firm and retrying when the provider returns 429.
+
+    A 429 extends the shared pause so no other task starts a request until the
+    limit resets, instead of failing firms. Transient connection and server
+    errors are retried after a short backoff for this firm only.
+    """
+    for attempt in range(MAX_API_ATTEMPTS):
+        await pause.wait()
+        try:
+            return await call()
+        except (openai.RateLimitError, anthropic.RateLimitError) as e:
+            if attempt == MAX_API_ATTEMPTS - 1:
+                raise
+
+            seconds = rate_limit_pause(e)
+            logger.warning("⏳ Rate limited, pausing for %.0fs", seconds)
+            pause.extend(seconds)
+        except TRANSIENT_ERRORS:
+            if attempt == MAX_API_ATTEMPTS - 1:
+                raise
+
+            await asyncio.sleep(2 ** attempt)
+
+
+async def research_firm(
+    researcher: ClaudeWebSearch | OpenAIWebSearch,
+    vc_firm: str,
+    system_prompt: str,
+    semaphore: asyncio.Semaphore,
+    pause: RateLimitPause
+) -> tuple[str, StructuredInvestmentOutput | None]:
+    """
+    Research a single VC firm, limited by the shared semaphore.
+
+    Args:
+        researcher: Web search helper used for the research call
+        vc_firm: VC firm name
+        system_prompt: Research instructions shared by every firm
+        semaphore: Limits how many firms are researched at once
+        pause: Shared pause every firm waits out after a rate limit
+
+    Returns:
+        The firm name and its structured output, or None if research failed
+    """
+    async with semaphore:
+        try:
+            logger.debug("Researching %s", vc_firm)
+            prompt = create_research_prompt(vc_firm)
+            response = await call_with_rate_limit(
+                pause,
+                lambda: researcher.search_async(prompt, system_prompt, output_schema=StructuredInvestmentOutput)
+            )
+
+            if response.structured is None:
+                raise ValueError("research answer did not match the output schema")
+            return vc_firm, response.structured
+
+        except Exception:
+            logger.exception("❌ Error processing %s", vc_firm)
+            return vc_firm, None
+
+
+async def research_firms(
+    researcher: ClaudeWebSearch | OpenAIWebSearch,
+    vc_firms: list[str],
+    concurrency: int,
+    writer: BufferedCsvWriter | None
+):
+    """Research firms concurrently, recording each result as it completes."""
+    semaphore = asyncio.Semaphore(concurrency)
+    pause = RateLimitPause()
+
+    # Build the shared instructions once so every firm sends an identical,
+    # cacheable prefix (same dates and text) ahead of its own short request
+    system_prompt = create_research_system_prompt()
+    tasks = [
+        asyncio.create_task(research_firm(researcher, vc_firm, system_prompt, semaphore, pause))
+        for vc_firm in vc_firms
+    ]
+
+    # Results are handled here, one at a time, so output and CSV rows never interleave
+    for task in async_tqdm.as_completed(tasks, total=len(tasks), desc="Researching VC firms"):
+        vc_firm, structured_output = await task
+        if structured_output is not None:
+            record_result(vc_firm, structured_output, writer)
+
+
+def research_firms_batch(
+    researcher: ClaudeWebSearch | OpenAIWebSearch,
+    vc_firms: list[str],
+    writer: BufferedCsvWriter | None
+):
+    """Research firms through the provider's batch API and record the results."""
+    system_prompt = create_research_system_prompt()
+    prompts = [create_research_prompt(vc_firm) for vc_firm in vc_firms]
+
+    print(f"📦 Submitting batch of {len(prompts)} firms, minus any cached (results may take up to 24 hours)")
+    results = researcher.search_batch(prompts, system_prompt, output_schema=StructuredInvestmentOutput)
+
+    for vc_firm, result in zip(vc_firms, results):
+        try:
+            if isinstance(result, BaseException):
+                raise result
+
+            structured_output = result.structured
+            if structured_output is None:
+                raise ValueError("research answer did not match the output schema")
+
+        except Exception:
+            logger.exception("❌ Error processing %s", vc_firm)
+            continue
+
+        record_result(vc_firm, structured_output, writer)
+
+
+def record_result(vc_firm: str, structured_output: StructuredInvestmentOutput, writer: BufferedCsvWriter | None):
+    """Log a firm's result and append it to the output CSV, if any."""
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %s", vc_firm, structured_output.model_dump_json())
+
+    if writer is not None:
+        append_to_csv(writer, vc_firm, structured_output)
+
+    logger.info("✅ %s: %s", vc_firm, "Yes" if structured_output.has_qualifying_investment else "No")
+
+
+def positive_int(value: str) -> int:
+    """argparse type for options that must be at least 1."""
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def main():
@@ -190,26 +464,79 @@ def main():
         help="Model to use for research (default: claude-sonnet-4-5)"
     )
     parser.add_argument("-o", "--output-csv", type=str, help="Output CSV file path")
+    parser.add_argument(
+        "--temperature",
+        type=float,
+        default=0.0,
+        help="Sampling temperature for Claude research (default: 0; only temperature 0 answers are cached)"
+    )
     parser.add_argument(
         "--max-searches",
         type=int,
         default=3,
         help="Maximum number of web searches per query (default: 2)"
     )
+    parser.add_argument(
+        "-c", "--concurrency",
+        type=positive_int,
+        default=8,
+        help="Number of firms researched in parallel (default: 8)"
+    )
+    parser.add_argument(
+        "--canonicalize",
+        action="store_true",
+        help="Treat firm names differing only in case as the same firm"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit all firms through the provider batch API (about half the cost, results within 24h)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Always query the provider instead of reusing research cached in {CACHE_PATH}"
+    )
+    parser.add_argument(
+        "--cache-ttl-days",
+        type=float,
+        default=7,
+        help="Days a cached research response stays valid (default: 7)"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Log the full structured result for every firm (same as --log-level DEBUG)"
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default="INFO",
+        help="Lowest level of messages shown (default: INFO)"
+    )
+    parser.add_argument(
+        "--rpm",
+        type=positive_int,
+        help="Requests per minute allowed for the research model (default: provider tier 1 limit)"
+    )
 
     args = parser.parse_args()
 
     # Get list of VC firms from either file or single name
     if args.input_file:
         with open(args.input_file, 'r', encoding='utf-8') as f:
-            vc_firms = [line.strip() for line in f if line.strip()]
+            vc_firms = normalize_firm_names(f, args.canonicalize)
     else:
-        vc_firms = [args.name]
+        vc_firms = normalize_firm_names([args.name], args.canonicalize)
 
     # Get already processed firms only if output CSV is provided
     if args.output_csv:
         processed_firms = get_processed_firms(args.output_csv)
-        remaining_firms = [firm for firm in vc_firms if firm not in processed_firms]
+        if args.canonicalize:
+            processed_keys = {firm.casefold() for firm in processed_firms}
+            remaining_firms = [firm for firm in vc_firms if firm.casefold() not in processed_keys]
+        else:
+            remaining_firms = [firm for firm in vc_firms if firm not in processed_firms]
 
         if not remaining_firms:
             print("✅ All firms already processed!")
@@ -224,33 +551,43 @@ def main():
 
     print(f"📊 Using model: {args.model}\n")
 
+    # Re-runs over overlapping firm lists reuse earlier research from disk
+    cache = None
+    if not args.no_cache:
+        cache = LLMCache(SQLiteCacheBackend(CACHE_PATH, ttl=args.cache_ttl_days * 24 * 3600))
+
     # Initialize researcher
     if "gpt" in args.model.lower():
-        researcher = OpenAIWebSearch(model=args.model)
+        rate_limiter = RateLimiter.for_provider("openai", requests_per_minute=args.rpm)
+        researcher = OpenAIWebSearch(model=args.model, cache=cache, rate_limiter=rate_limiter)
     elif "claude" in args.model.lower():
-        researcher = ClaudeWebSearch(model=args.model, max_uses=args.max_searches)
+        rate_limiter = RateLimiter.for_provider("anthropic", requests_per_minute=args.rpm)
+        researcher = ClaudeWebSearch(
+            model=args.model,
+            max_uses=args.max_searches,
+            temperature=args.temperature,
+            cache=cache,
+            rate_limiter=rate_limiter
+        )
     else:
         print(f"❌ Unknown model provider for {args.model}")
         return 1
 
-    # Process each VC firm with progress bar
-    for vc_firm in tqdm(remaining_firms, desc="Researching VC firms"):
-        try:
-            print(f"Researching {vc_firm}")
-            prompt = create_research_prompt(vc_firm)
-            response = researcher.search(prompt)
-
-            structured_output = create_structured_output(response.final_output, response.citations)
-            print_json(data=structured_output.model_dump())
-            
-            if args.output_csv:
-                append_to_csv(args.output_csv, vc_firm, structured_output)
-            
-            tqdm.write(f"✅ {vc_firm}: {'Yes' if structured_output.has_qualifying_investment else 'No'}")
-
-        except Exception as e:
-            tqdm.write(f"❌ Error processing {vc_firm}: {str(e)}")
-            continue
+    # call_with_rate_limit owns retries; SDK retries on top would multiply the
+    # attempts per firm (each a full web search) and ignore the shared pause
+    researcher.async_client = researcher.async_client.with_options(max_retries=0)
+
+    listener = setup_logging(logging.DEBUG if args.verbose else getattr(logging, args.log_level))
+    try:
+        flush_rows = CSV_FLUSH_ROWS if len(remaining_firms) > CSV_BUFFER_THRESHOLD else 1
+        with open_csv_writer(args.output_csv, flush_rows) as writer:
+            if args.batch:
+                research_firms_batch(researcher, remaining_firms, writer)
+            else:
+                # Process VC firms concurrently with progress bar
+                asyncio.run(research_firms(researcher, remaining_firms, args.concurrency, writer))
+    finally:
+        listener.stop()
 
     print(f"\n✅ Research complete! Results saved to: {args.output_csv}")
     return 0